@@ -5,14 +5,18 @@ UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
 import csv
+import heapq
 import re
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
+PREFIX_MAX_EXPANSIONS = 16  # Vocabulary terms a query token may expand to (most frequent kept)
+PREFIX_MIN_LENGTH = 3       # Shortest prefix with precomputed expansions (= shortest token)
+PREFIX_WEIGHT = 0.5         # Score multiplier for prefix (non-exact) matches
 
 CSV_CONFIG = {
     "style": {
@@ -83,14 +87,18 @@ AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 class BM25:
     """BM25 ranking algorithm for text search"""
 
-    def __init__(self, k1=1.5, b=0.75):
+    def __init__(self, k1=1.5, b=0.75, max_expansions=PREFIX_MAX_EXPANSIONS, prefix_weight=PREFIX_WEIGHT):
         self.k1 = k1
         self.b = b
+        self.max_expansions = max_expansions
+        self.prefix_weight = prefix_weight
         self.corpus = []
         self.doc_lengths = []
         self.avgdl = 0
         self.idf = {}
         self.doc_freqs = defaultdict(int)
+        self.postings = {}
+        self.prefixes = {}
         self.N = 0
 
     def tokenize(self, text):
@@ -107,40 +115,99 @@ class BM25:
         self.doc_lengths = [len(doc) for doc in self.corpus]
         self.avgdl = sum(self.doc_lengths) / self.N
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+        # Inverted index: word -> [(doc idx, term frequency), ...]
+        postings = defaultdict(list)
+        for idx, doc in enumerate(self.corpus):
+            for word, tf in Counter(doc).items():
+                postings[word].append((idx, tf))
+        self.postings = dict(postings)
+
+        for word, docs in self.postings.items():
+            self.doc_freqs[word] = len(docs)
 
         for word, freq in self.doc_freqs.items():
             self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
 
+        self.build_prefixes()
+
+    def build_prefixes(self):
+        """Precompute, per prefix, the max_expansions most frequent longer terms.
+
+        Ties on document frequency go to the alphabetically first term. Lookup
+        is then a single dict access, independent of vocabulary size.
+        """
+        heaps = defaultdict(list)
+        k = self.max_expansions
+        for rank, word in enumerate(sorted(self.doc_freqs)):
+            # Min-heap of (df, -rank): evicts the rarest, then the alphabetically last
+            item = (self.doc_freqs[word], -rank, word)
+            for end in range(PREFIX_MIN_LENGTH, len(word)):
+                heap = heaps[word[:end]]
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        self.prefixes = {
+            prefix: [word for _, _, word in sorted(heap, reverse=True)]
+            for prefix, heap in heaps.items()
+        }
+
+    def expand(self, prefix):
+        """Vocabulary terms prefix is a proper prefix of, capped at max_expansions.
+
+        The cap keeps the terms with the highest document frequency, i.e. the
+        completions most likely meant ("con" -> "connection" over one-off
+        codes), however many terms share the prefix. Each kept term still
+        scores with its own IDF. Prefixes shorter than PREFIX_MIN_LENGTH do
+        not expand.
+        """
+        return self.prefixes.get(prefix, [])
+
+    def _accumulate(self, query):
+        """Sum BM25 contributions per document, visiting only matching postings.
+
+        Each query token matches its exact term and, through the precomputed
+        prefix table, terms it is a prefix of ("anim" -> "animation"). Prefix
+        matches are scored with their own IDF times prefix_weight, scaled by
+        their document frequency relative to the most common completion so
+        rare one-off terms cannot outrank the likely word. A document counts
+        only its best match per query token.
+        """
+        scores = defaultdict(float)
+        if not self.N:
+            return scores
+        k1, b, avgdl = self.k1, self.b, self.avgdl
+        for token in self.tokenize(query):
+            terms = [(token, 1.0)] if token in self.idf else []
+            expansions = self.expand(token)
+            if expansions:
+                # Weight each completion by how likely it is relative to the most common one
+                top_df = self.doc_freqs[expansions[0]]
+                terms += [(word, self.prefix_weight * self.doc_freqs[word] / top_df) for word in expansions]
+
+            best = {}
+            for word, weight in terms:
+                idf = self.idf[word] * weight
+                for idx, tf in self.postings[word]:
+                    denominator = tf + k1 * (1 - b + b * self.doc_lengths[idx] / avgdl)
+                    contribution = idf * (tf * (k1 + 1)) / denominator
+                    if contribution > best.get(idx, 0):
+                        best[idx] = contribution
+            for idx, contribution in best.items():
+                scores[idx] += contribution
+        return scores
+
     def score(self, query):
         """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
-
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
-
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
-
-            scores.append((idx, score))
-
+        matched = self._accumulate(query)
+        scores = [(idx, matched.get(idx, 0)) for idx in range(self.N)]
         return sorted(scores, key=lambda x: x[1], reverse=True)
 
+    def top_k(self, query, k=10):
+        """Top k (idx, score) pairs with score > 0, without scoring every document"""
+        matched = self._accumulate(query)
+        return heapq.nlargest(k, matched.items(), key=lambda x: x[1])
+
 
 # ============ SEARCH FUNCTIONS ============
 def _load_csv(filepath):
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Atomic file writes shared by the maintenance scripts
+
+Text is written to a temp file in the target's directory, fsynced and moved
+into place with os.replace, so readers never see a partially written file.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def atomic_write_text(path, text, encoding="utf-8", newline=None):
+    """Write text to path via a temp file in the same directory and os.replace"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with open(fd, "w", encoding=encoding, newline=newline) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_json(path, data, indent=4, **kwargs):
+    """Serialise data as JSON (extra kwargs go to json.dumps) and write it atomically"""
+    atomic_write_text(path, json.dumps(data, indent=indent, **kwargs))
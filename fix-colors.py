@@ -1,11 +1,11 @@
-import re
+import argparse
 
-# Read the file
-with open('app/chat/page.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
+from source_rewriter import MultiReplacer, print_report, rewrite_file
+
+TARGET_FILE = 'app/chat/page.tsx'
 
 # Define color replacements for IPSR section only
-# We need to be careful to only replace within the IPSR section
+# Pass --region-start/--region-end markers around the IPSR section to scope them
 color_mappings = {
     'bg-emerald-600/10 hover:bg-emerald-600/20 border border-emerald-600/20': 'bg-slate-600/10 hover:bg-slate-600/20 border border-slate-600/20',
     'text-emerald-400 group-hover:text-emerald-300': 'text-slate-400 group-hover:text-slate-300',
@@ -29,12 +29,20 @@ color_mappings = {
     'text-fuchsia-400 group-hover:text-fuchsia-300': 'text-slate-400 group-hover:text-slate-300',
 }
 
-# Apply replacements
-for old, new in color_mappings.items():
-    content = content.replace(old, new)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replace IPSR quick-access colors with slate")
+    parser.add_argument("--region-start", help="Marker where the IPSR section starts")
+    parser.add_argument("--region-end", help="Marker where the IPSR section ends")
+    parser.add_argument("--dry-run", action="store_true", help="Print a unified diff instead of writing")
+    args = parser.parse_args()
+    if bool(args.region_start) != bool(args.region_end):
+        parser.error("--region-start and --region-end must be used together")
 
-# Write back
-with open('app/chat/page.tsx', 'w', encoding='utf-8') as f:
-    f.write(content)
+    # Apply all replacements in a single pass
+    result = rewrite_file(TARGET_FILE, MultiReplacer(color_mappings), args.region_start, args.region_end, args.dry_run)
+    print_report([result], args.dry_run)
 
-print("Color replacements completed successfully!")
+    if not result["regions"]:
+        print("Region markers not found, nothing replaced.")
+    elif not args.dry_run:
+        print("Color replacements completed successfully!")
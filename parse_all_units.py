@@ -1,6 +1,7 @@
 import re
-import json
-import os
+
+from atomic_write import atomic_write_json
+from unit_resolver import UnitIndex, classify_unit_type, load_units, normalise
 
 HTML_FILE = r"c:\Users\ychum\.gemini\antigravity\scratch\chst-chatbot-v1\page_source_snippet.html"
 UNITS_JSON_FILE = r"c:\Users\ychum\.gemini\antigravity\scratch\chst-chatbot-v1\utar-staff-mcp\mappings\units.json"
@@ -22,23 +23,7 @@ def parse_html(file_path):
         value = value.strip()
         
         # Determine logical type
-        unit_type = "Organisation Unit" # Default
-        if "Faculty" in text:
-            unit_type = "Faculty"
-        elif "Institute" in text:
-            unit_type = "Institute"
-        elif "Centre" in text:
-            unit_type = "Centre"
-        elif "Division" in text:
-            unit_type = "Administrative Division"
-        elif "Department" in text:
-            unit_type = "Administrative Department"
-        elif "Office" in text:
-            unit_type = "Administrative Office"
-        elif "Library" in text:
-            unit_type = "Library"
-        elif "Chancellery" in text:
-            unit_type = "Chancellery"
+        unit_type = classify_unit_type(text)
             
         units.append({
             "canonical": text,
@@ -50,31 +35,23 @@ def parse_html(file_path):
     return units
 
 def merge_units(new_units, existing_units_file):
-    if os.path.exists(existing_units_file):
-        with open(existing_units_file, "r", encoding="utf-8") as f:
-            existing_units = json.load(f)
-    else:
-        existing_units = []
+    existing_units = load_units(existing_units_file)
 
-    # Create a map of existing units by canonical lower and acronym
-    existing_map = {}
-    for u in existing_units:
-        existing_map[u["canonical"].lower()] = u
-        if u.get("acronym"):
-            existing_map[u["acronym"].lower()] = u
+    # Index existing units by canonical, acronym and aliases.
+    # Matching is exact only: a fuzzy hit could fold a new unit into a sibling
+    # ("Civil" vs "Chemical" Engineering) and rewrite its aliases.
+    index = UnitIndex(existing_units)
 
     added_count = 0
     updated_count = 0
 
     for new_u in new_units:
-        key_canon = new_u["canonical"].lower()
-        key_acro = new_u["acronym"].lower()
-        
         match = None
-        if key_canon in existing_map:
-            match = existing_map[key_canon]
-        elif key_acro in existing_map:
-            match = existing_map[key_acro]
+        for name in (new_u["canonical"], new_u["acronym"]):
+            result = index.resolve(name, fuzzy=False)
+            if result:
+                match = result["unit"]
+                break
         
         if match:
             # Update existing
@@ -91,19 +68,19 @@ def merge_units(new_units, existing_units_file):
             # Ensure aliases exist
             if "aliases" not in match:
                 match["aliases"] = []
-            if new_u["canonical"] not in match["aliases"]:
-                match["aliases"].append(new_u["canonical"])
-            if new_u["acronym"] not in match["aliases"]:
-                match["aliases"].append(new_u["acronym"])
+            # Index new aliases so later rows in this run can match them
+            match_id = result["unit_id"]
+            for alias in (new_u["canonical"], new_u["acronym"]):
+                if alias not in match["aliases"]:
+                    match["aliases"].append(alias)
+                    index.add_alias(normalise(alias), match_id)
         else:
             # Add new
-            existing_units.append(new_u)
-            # Update map so we don't add duplicates if list has them? Unlikely for this list.
-            existing_map[key_canon] = new_u
+            # Index it so we don't add duplicates if the list has them
+            index.add_unit(new_u)
             added_count += 1
 
-    with open(existing_units_file, "w", encoding="utf-8") as f:
-        json.dump(existing_units, f, indent=4)
+    atomic_write_json(existing_units_file, existing_units)
 
     print(f"Processed {len(new_units)} units from HTML.")
     print(f"Added {added_count} new units.")
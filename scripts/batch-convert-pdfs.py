@@ -3,6 +3,7 @@
 Batch convert all PDF files in a directory to Markdown
 """
 
+import json
 import os
 import sys
 from pathlib import Path
@@ -40,14 +41,28 @@ def convert_all_pdfs(input_dir, output_dir):
             # page_chunks=True returns a list of dicts, join them
             if isinstance(md_result, list):
                 md_text = '\n\n'.join([chunk['text'] for chunk in md_result])
+                pages = [
+                    {"page": chunk.get('metadata', {}).get('page', i + 1), "text": chunk['text']}
+                    for i, chunk in enumerate(md_result)
+                ]
             else:
                 md_text = md_result
+                pages = None
             
             # Save markdown
             md_file = output_path / f"{pdf_file.stem}.md"
             with open(md_file, 'w', encoding='utf-8') as f:
                 f.write(md_text)
             
+            # Save per-page sidecar (used by lexical-index.py for page-level hits);
+            # drop a stale one from an earlier conversion so it can't shadow the new markdown
+            pages_file = output_path / f"{pdf_file.stem}.pages.json"
+            if pages is not None:
+                with open(pages_file, 'w', encoding='utf-8') as f:
+                    json.dump(pages, f, ensure_ascii=False)
+            elif pages_file.exists():
+                pages_file.unlink()
+            
             print(f"  ✓ Saved to {md_file.name} ({len(md_text)} chars)")
             success_count += 1
             
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Offline lexical (BM25) index over converted document-library markdown
+
+Indexes the markdown written by batch-convert-pdfs.py, one entry per page when
+a <stem>.pages.json sidecar exists, and answers exact-term queries (form
+numbers, policy codes) without an embedding call. The JSON output can be used
+as a cheap first stage or as a lexical signal for hybrid fusion.
+
+Usage:
+    python lexical-index.py build [--markdown-dir documents/markdown] [--index documents/lexical-index.json]
+    python lexical-index.py search "<query>" [-n 10] [--json]
+    python lexical-index.py search --stdin [-n 10] < queries.txt   (one JSON line per query)
+    python lexical-index.py bench [--docs 5000] [--queries 500] [-n 10]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / ".shared" / "ui-ux-pro-max" / "scripts"))
+from atomic_write import atomic_write_json  # noqa: E402
+from core import BM25  # noqa: E402
+
+# ============ CONFIGURATION ============
+PROJECT_DIR = Path(__file__).parent.parent
+MARKDOWN_DIR = PROJECT_DIR / "documents" / "markdown"
+INDEX_FILE = PROJECT_DIR / "documents" / "lexical-index.json"
+INDEX_VERSION = 2
+MAX_RESULTS = 10
+PREVIEW_CHARS = 240
+CLI_BENCH_QUERIES = 10  # Cold `search` processes timed by bench
+
+
+# ============ CORPUS ============
+def load_documents(markdown_dir):
+    """Load markdown files as index entries, split into pages when a sidecar exists"""
+    docs = []
+    for md_file in sorted(Path(markdown_dir).glob("*.md")):
+        pages_file = md_file.with_suffix(".pages.json")
+        if pages_file.exists():
+            with open(pages_file, "r", encoding="utf-8") as f:
+                pages = json.load(f)
+            for page in pages:
+                docs.append({"source": md_file.name, "page": page.get("page"), "text": page.get("text", "")})
+        else:
+            with open(md_file, "r", encoding="utf-8") as f:
+                docs.append({"source": md_file.name, "page": None, "text": f.read()})
+    return docs
+
+
+def _preview(text):
+    text = " ".join(text.split())
+    return text[:PREVIEW_CHARS] + ("..." if len(text) > PREVIEW_CHARS else "")
+
+
+# ============ INDEX ============
+def build_index(docs):
+    """Fit BM25 over docs and return (bm25, entries) with text reduced to a preview"""
+    bm25 = BM25()
+    bm25.fit([doc["text"] for doc in docs])
+    bm25.corpus = []  # Token lists are not needed once postings are built
+    entries = [{"source": d["source"], "page": d["page"], "preview": _preview(d["text"])} for d in docs]
+    return bm25, entries
+
+
+class _PackedPostings(dict):
+    """term -> "idx tf idx tf ..." string, decoded to [(idx, tf), ...] on first access"""
+
+    def __getitem__(self, word):
+        value = dict.__getitem__(self, word)
+        if isinstance(value, str):
+            numbers = iter(map(int, value.split()))
+            value = list(zip(numbers, numbers))
+            dict.__setitem__(self, word, value)
+        return value
+
+
+class _PackedPrefixes(dict):
+    """prefix -> space-separated expansions, split on first lookup"""
+
+    def get(self, prefix, default=None):
+        value = dict.get(self, prefix)
+        if value is None:
+            return default
+        if isinstance(value, str):
+            value = value.split()
+            dict.__setitem__(self, prefix, value)
+        return value
+
+
+def save_index(index_file, bm25, entries):
+    """Persist the fitted index as JSON (atomic replace).
+
+    Postings and prefix expansions are packed into one string per key, and
+    doc_freqs is stored rather than re-derived, so loading is a flat parse and
+    only the terms a query touches are ever decoded.
+    """
+    data = {
+        "version": INDEX_VERSION,
+        "k1": bm25.k1,
+        "b": bm25.b,
+        "N": bm25.N,
+        "avgdl": bm25.avgdl,
+        "doc_lengths": bm25.doc_lengths,
+        "idf": bm25.idf,
+        "doc_freqs": bm25.doc_freqs,
+        "postings": {
+            word: " ".join(f"{idx} {tf}" for idx, tf in docs)
+            for word, docs in bm25.postings.items()
+        },
+        "prefixes": {prefix: " ".join(words) for prefix, words in bm25.prefixes.items()},
+        "entries": entries,
+    }
+    index_file = Path(index_file)
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(index_file, data, indent=None, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_index(index_file):
+    """Load a persisted index, returning (bm25, entries)"""
+    with open(index_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != INDEX_VERSION:
+        raise ValueError(f"Unsupported index version in {index_file}, rebuild it")
+
+    bm25 = BM25(k1=data["k1"], b=data["b"])
+    bm25.N = data["N"]
+    bm25.avgdl = data["avgdl"]
+    bm25.doc_lengths = data["doc_lengths"]
+    bm25.idf = data["idf"]
+    bm25.doc_freqs.update(data["doc_freqs"])
+    bm25.postings = _PackedPostings(data["postings"])
+    bm25.prefixes = _PackedPrefixes(data["prefixes"])
+    return bm25, data["entries"]
+
+
+def search(bm25, entries, query, max_results=MAX_RESULTS):
+    """Top-k lexical lookup"""
+    results = []
+    for rank, (idx, score) in enumerate(bm25.top_k(query, max_results), 1):
+        entry = entries[idx]
+        results.append({
+            "rank": rank,
+            "score": round(score, 4),
+            "source": entry["source"],
+            "page": entry["page"],
+            "preview": entry["preview"],
+        })
+    return {"query": query, "count": len(results), "results": results}
+
+
+# ============ BENCHMARK ============
+def _synthetic_corpus(n_docs, rng, vocab_size=20000, doc_tokens=300):
+    """Generate pages of Zipf-distributed filler, each tagged with a unique form code.
+
+    Returns (docs, codes, fillers, vocab) where fillers[i] is page i's filler
+    words and vocab is ordered most frequent first.
+    """
+    vocab = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10)))
+             for _ in range(vocab_size)]
+    weights = [1 / (rank + 1) for rank in range(vocab_size)]
+    docs, codes, fillers = [], [], []
+    for i in range(n_docs):
+        code = f"FM-IPSR-{i:06d}"
+        filler = rng.choices(vocab, weights=weights, k=doc_tokens)
+        words = list(filler)
+        words.insert(rng.randrange(len(words)), code)
+        docs.append({"source": f"synthetic-{i // 20:04d}.md", "page": i % 20 + 1, "text": " ".join(words)})
+        codes.append(code)
+        fillers.append(filler)
+    return docs, codes, fillers, vocab
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _latency(values):
+    return {"p50": round(_percentile(values, 50), 3), "p95": round(_percentile(values, 95), 3)}
+
+
+def benchmark(n_docs=5000, n_queries=500, max_results=MAX_RESULTS, seed=42):
+    """Measure build/load time, top-k vs full-scan latency, CLI latency and recall@k"""
+    rng = random.Random(seed)
+    docs, codes, fillers, vocab = _synthetic_corpus(n_docs, rng)
+
+    started = time.perf_counter()
+    bm25, entries = build_index(docs)
+    build_seconds = time.perf_counter() - started
+
+    targets = rng.sample(range(n_docs), min(n_queries, n_docs))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_file = Path(tmp) / "index.json"
+        save_index(index_file, bm25, entries)
+        size_mb = index_file.stat().st_size / 1e6
+        started = time.perf_counter()
+        bm25, entries = load_index(index_file)
+        load_seconds = time.perf_counter() - started
+
+        # End-to-end cost of one `search` process (interpreter start + load + query)
+        cli_queries = [codes[idx] for idx in targets[:CLI_BENCH_QUERIES]]
+        cli_ms = []
+        for query in cli_queries:
+            started = time.perf_counter()
+            subprocess.run([sys.executable, __file__, "--index", str(index_file), "search", query, "--json"],
+                           check=True, stdout=subprocess.DEVNULL)
+            cli_ms.append((time.perf_counter() - started) * 1000)
+
+        # Same queries answered by one `search --stdin` process
+        started = time.perf_counter()
+        subprocess.run([sys.executable, __file__, "--index", str(index_file), "search", "--stdin"],
+                       input="\n".join(cli_queries), text=True, check=True, stdout=subprocess.DEVNULL)
+        batch_ms = (time.perf_counter() - started) * 1000 / len(cli_queries)
+
+    # Query sets per target page:
+    #   code             - its unique form code plus two of its words (recall is ~1 by construction)
+    #   code_distractors - its code plus four of the most common words, shared with many other pages
+    #   page_terms       - four distinct words from the page and no code, the realistic hard case
+    common = vocab[:50]
+    query_sets = {"code": [], "code_distractors": [], "page_terms": []}
+    for idx in targets:
+        query_sets["code"].append((idx, f"form {codes[idx]} {' '.join(fillers[idx][:2])}"))
+        query_sets["code_distractors"].append((idx, f"{codes[idx]} {' '.join(rng.sample(common, 4))}"))
+        query_sets["page_terms"].append((idx, " ".join(rng.sample(sorted(set(fillers[idx])), 4))))
+
+    recall, topk_ms, scan_ms = {}, [], []
+    for name, queries in query_sets.items():
+        hits = 0
+        for idx, query in queries:
+            started = time.perf_counter()
+            top = bm25.top_k(query, max_results)
+            topk_ms.append((time.perf_counter() - started) * 1000)
+            hits += any(doc_idx == idx for doc_idx, _ in top)
+
+            started = time.perf_counter()
+            bm25.score(query)[:max_results]
+            scan_ms.append((time.perf_counter() - started) * 1000)
+        recall[name] = round(hits / len(queries), 4)
+
+    # Prefix queries (first 4 characters of page words) expand through the prefix table
+    prefix_ms = []
+    for idx, query in query_sets["page_terms"]:
+        query = " ".join(word[:4] for word in query.split())
+        started = time.perf_counter()
+        bm25.top_k(query, max_results)
+        prefix_ms.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "docs": n_docs,
+        "queries_per_set": len(targets),
+        "vocabulary": len(bm25.idf),
+        "build_seconds": round(build_seconds, 3),
+        "load_seconds": round(load_seconds, 3),
+        "index_mb": round(size_mb, 2),
+        f"recall@{max_results}": recall,
+        "top_k_ms": _latency(topk_ms),
+        "full_rank_ms": _latency(scan_ms),
+        "prefix_top_k_ms": _latency(prefix_ms),
+        "cli_search_ms": _latency(cli_ms),
+        "cli_stdin_ms_per_query": round(batch_ms, 3),
+    }
+
+
+# ============ CLI ============
+def format_output(result):
+    """Plain-text search results"""
+    output = [f"Query: {result['query']} | Found: {result['count']} results\n"]
+    for r in result["results"]:
+        page = f" p.{r['page']}" if r["page"] is not None else ""
+        output.append(f"{r['rank']}. {r['source']}{page} (score {r['score']})")
+        output.append(f"   {r['preview']}")
+    return "\n".join(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexical pre-filter index for the document library")
+    parser.add_argument("--index", default=str(INDEX_FILE), help="Index file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Index converted markdown")
+    p_build.add_argument("--markdown-dir", default=str(MARKDOWN_DIR), help="Output directory of batch-convert-pdfs.py")
+
+    p_search = sub.add_parser("search", help="Top-k lexical lookup")
+    p_search.add_argument("query", nargs="?")
+    p_search.add_argument("--stdin", action="store_true",
+                          help="Answer one query per stdin line with a single index load (JSON lines)")
+    p_search.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS)
+    p_search.add_argument("--json", action="store_true", help="Output as JSON")
+
+    p_bench = sub.add_parser("bench", help="Benchmark on a generated corpus")
+    p_bench.add_argument("--docs", type=int, default=5000)
+    p_bench.add_argument("--queries", type=int, default=500)
+    p_bench.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if not os.path.exists(args.markdown_dir):
+            print(f"Error: Markdown directory not found: {args.markdown_dir}")
+            sys.exit(1)
+        started = time.perf_counter()
+        docs = load_documents(args.markdown_dir)
+        bm25, entries = build_index(docs)
+        save_index(args.index, bm25, entries)
+        sources = len({d["source"] for d in docs})
+        print(f"✓ Indexed {len(docs)} pages from {sources} files ({len(bm25.idf)} terms) "
+              f"in {time.perf_counter() - started:.2f}s")
+        print(f"  Saved to {args.index}")
+
+    elif args.command == "search":
+        if not os.path.exists(args.index):
+            print(f"Error: Index not found: {args.index} (run 'build' first)")
+            sys.exit(1)
+        if args.stdin == bool(args.query):
+            parser.error("search needs a query or --stdin (not both)")
+        bm25, entries = load_index(args.index)
+        if args.stdin:
+            for line in sys.stdin:
+                query = line.strip()
+                if query:
+                    print(json.dumps(search(bm25, entries, query, args.max_results), ensure_ascii=False), flush=True)
+            return
+        result = search(bm25, entries, args.query, args.max_results)
+        if args.json:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
+
+    elif args.command == "bench":
+        print(json.dumps(benchmark(args.docs, args.queries, args.max_results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
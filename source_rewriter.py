@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Source rewriter - apply a literal replacement table to source files in one pass
+
+All mappings are compiled into a single alternation regex (longest pattern
+first), so each file is scanned once no matter how many mappings there are.
+Replacements do not chain: text produced by one mapping is never re-matched.
+
+Usage:
+    python source_rewriter.py --mapping map.json [paths ...] [--dry-run]
+        [--region-start <marker> --region-end <marker>] [--ext .tsx --ext .ts]
+        [--workers 4] [--timings 10]
+
+paths default to app/ and components/. map.json is a JSON object of
+{"old text": "new text"}.
+"""
+
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from atomic_write import atomic_write_text
+
+# ============ CONFIGURATION ============
+DEFAULT_PATHS = ["app", "components"]
+DEFAULT_EXTENSIONS = [".ts", ".tsx", ".js", ".jsx", ".css"]
+SKIP_DIRS = {"node_modules", ".next", ".git", "__pycache__"}
+
+
+# ============ REPLACER ============
+class MultiReplacer:
+    """Single-pass replacement of many literal strings"""
+
+    def __init__(self, mapping):
+        self.mapping = {old: new for old, new in mapping.items() if old}
+        # Longest first so overlapping patterns resolve to the longest match
+        patterns = sorted(self.mapping, key=len, reverse=True)
+        self.pattern = re.compile("|".join(map(re.escape, patterns))) if patterns else None
+
+    def sub(self, text):
+        """Return (new_text, replacement_count)"""
+        if self.pattern is None:
+            return text, 0
+        mapping = self.mapping
+        return self.pattern.subn(lambda m: mapping[m.group(0)], text)
+
+
+def apply_in_regions(text, replacer, region_start=None, region_end=None):
+    """Apply replacer to the whole text, or only between region markers.
+
+    Markers are literal strings and are left untouched. Every start/end pair
+    is rewritten; a start marker without a matching end marker is skipped.
+    Start and end may be the same string (e.g. a "// IPSR" fence).
+    Returns (new_text, replacement_count, region_count).
+    """
+    if bool(region_start) != bool(region_end):
+        raise ValueError("region_start and region_end must be given together")
+    if not region_start:
+        new_text, count = replacer.sub(text)
+        return new_text, count, 1
+
+    parts = []
+    total = regions = 0
+    pos = 0
+    while True:
+        start = text.find(region_start, pos)
+        if start == -1:
+            break
+        body_start = start + len(region_start)
+        end = text.find(region_end, body_start)
+        if end == -1:
+            break
+        new_body, count = replacer.sub(text[body_start:end])
+        parts.append(text[pos:body_start])
+        parts.append(new_body)
+        parts.append(region_end)
+        total += count
+        regions += 1
+        # Resume after the end marker so it is not taken as the next start
+        pos = end + len(region_end)
+    parts.append(text[pos:])
+    return "".join(parts), total, regions
+
+
+# ============ FILES ============
+def iter_source_files(paths, extensions=DEFAULT_EXTENSIONS):
+    """Yield source files under paths (files are yielded as given)"""
+    extensions = tuple(extensions)
+    for path in map(Path, paths):
+        if path.is_file():
+            yield path
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for filename in sorted(filenames):
+                if filename.endswith(extensions):
+                    yield Path(dirpath) / filename
+
+
+def rewrite_file(path, replacer, region_start=None, region_end=None, dry_run=False):
+    """Rewrite one file and return a result dict (diff included on dry run)"""
+    path = Path(path)
+    started = time.perf_counter()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        text = f.read()
+
+    new_text, count, regions = apply_in_regions(text, replacer, region_start, region_end)
+    result = {"path": str(path), "replacements": count, "regions": regions, "diff": None}
+
+    if count and new_text != text:
+        if dry_run:
+            result["diff"] = "".join(difflib.unified_diff(
+                text.splitlines(keepends=True),
+                new_text.splitlines(keepends=True),
+                fromfile=f"a/{path}",
+                tofile=f"b/{path}",
+            ))
+        else:
+            atomic_write_text(path, new_text, newline="")
+
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+# ============ PARALLEL DRIVER ============
+_worker_replacer = None
+
+
+def _init_worker(mapping):
+    global _worker_replacer
+    _worker_replacer = MultiReplacer(mapping)
+
+
+def _rewrite_in_worker(args):
+    path, region_start, region_end, dry_run = args
+    try:
+        return rewrite_file(path, _worker_replacer, region_start, region_end, dry_run)
+    except (OSError, UnicodeDecodeError) as e:
+        return {"path": str(path), "error": str(e), "replacements": 0, "regions": 0, "diff": None, "seconds": 0.0}
+
+
+def rewrite_tree(mapping, paths=DEFAULT_PATHS, region_start=None, region_end=None,
+                 dry_run=False, extensions=DEFAULT_EXTENSIONS, workers=None):
+    """Rewrite every matching file under paths, in parallel across processes"""
+    files = list(iter_source_files(paths, extensions))
+    jobs = [(f, region_start, region_end, dry_run) for f in files]
+
+    if workers == 1 or len(files) < 2:
+        _init_worker(mapping)
+        return [_rewrite_in_worker(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(mapping,)) as pool:
+        return list(pool.map(_rewrite_in_worker, jobs, chunksize=16))
+
+
+def load_mapping(mapping_file):
+    """Load a {"old": "new"} JSON mapping table"""
+    with open(mapping_file, "r", encoding="utf-8") as f:
+        mapping = json.load(f)
+    if not isinstance(mapping, dict):
+        raise ValueError(f"Mapping file must contain a JSON object: {mapping_file}")
+    return mapping
+
+
+def print_report(results, dry_run=False, timings=0):
+    """Print diffs (dry run), per-file counts and the slowest files"""
+    changed = [r for r in results if r["replacements"]]
+    errors = [r for r in results if r.get("error")]
+
+    for r in changed:
+        if dry_run and r["diff"]:
+            sys.stdout.write(r["diff"])
+    for r in changed:
+        print(f"  {r['path']}: {r['replacements']} replacements ({r['seconds'] * 1000:.2f} ms)")
+    for r in errors:
+        print(f"  ✗ {r['path']}: {r['error']}")
+
+    if timings:
+        print(f"\nSlowest {timings} files:")
+        for r in sorted(results, key=lambda r: r["seconds"], reverse=True)[:timings]:
+            print(f"  {r['seconds'] * 1000:8.2f} ms  {r['path']}")
+
+    total = sum(r["replacements"] for r in results)
+    seconds = sum(r["seconds"] for r in results)
+    action = "Would replace" if dry_run else "Replaced"
+    print(f"\n{action} {total} occurrences in {len(changed)} of {len(results)} files "
+          f"({seconds * 1000:.1f} ms file time)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-pass multi-pattern source rewriter")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS, help="Files or directories (default: app components)")
+    parser.add_argument("--mapping", "-m", required=True, help="JSON object of {old: new} replacements")
+    parser.add_argument("--region-start", help="Only rewrite text after this marker...")
+    parser.add_argument("--region-end", help="...and before this marker")
+    parser.add_argument("--ext", action="append", help="File extensions to include (default: .ts .tsx .js .jsx .css)")
+    parser.add_argument("--dry-run", action="store_true", help="Print unified diffs instead of writing")
+    parser.add_argument("--workers", "-j", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--timings", type=int, default=0, metavar="N", help="Show the N slowest files")
+
+    args = parser.parse_args()
+    if bool(args.region_start) != bool(args.region_end):
+        parser.error("--region-start and --region-end must be used together")
+
+    results = rewrite_tree(
+        load_mapping(args.mapping),
+        args.paths,
+        args.region_start,
+        args.region_end,
+        args.dry_run,
+        args.ext or DEFAULT_EXTENSIONS,
+        args.workers,
+    )
+    print_report(results, args.dry_run, args.timings)
+
+
+if __name__ == "__main__":
+    main()
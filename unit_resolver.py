@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""
+Organisation unit resolver - indexed lookup of UTAR unit names
+
+Resolves free-text unit names ("Dept. of Computing", "LKCFES", "Departmnt of
+Surveying") to entries in lib/tools/units.json using an exact index over
+normalised canonicals/aliases plus a trigram index with edit-distance
+verification for fuzzy variants.
+
+Usage:
+    python unit_resolver.py build [--units units.json] [--index units.index.json]
+    python unit_resolver.py resolve "<name>" [--parent <unit>] [--json]
+    python unit_resolver.py normalise-csv <file.csv> [--column Department] [--parent <unit>] [--to canonical|acronym] [--output out.csv]
+    python unit_resolver.py bench [--n 100000]
+"""
+
+import argparse
+import csv
+import hashlib
+import heapq
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter, OrderedDict, defaultdict
+from itertools import chain
+from pathlib import Path
+
+from atomic_write import atomic_write_json, atomic_write_text
+
+# ============ CONFIGURATION ============
+UNITS_JSON_FILE = Path(__file__).parent / "lib" / "tools" / "units.json"
+INDEX_FILE = UNITS_JSON_FILE.with_suffix(".index.json")
+INDEX_VERSION = 1
+
+FUZZY_MIN_LENGTH = 5      # Keys shorter than this (acronyms) only match exactly
+FUZZY_CANDIDATES = 8      # Trigram candidates verified with edit distance
+FUZZY_THRESHOLD = 0.85    # Minimum similarity (1 - distance / length)
+FUZZY_MARGIN = 0.05       # Best fuzzy match must beat any other unit's match by this much
+FUZZY_CACHE_SIZE = 4096   # Fuzzy lookups remembered per index (least recently used evicted)
+
+# Abbreviations expanded during normalisation, so "Dept." and "Department" share a key
+ABBREVIATIONS = {
+    "dept": "department",
+    "depts": "department",
+    "div": "division",
+    "fac": "faculty",
+    "inst": "institute",
+    "ctr": "centre",
+    "cntr": "centre",
+    "center": "centre",
+    "off": "office",
+    "admin": "administration",
+    "eng": "engineering",
+    "engg": "engineering",
+    "sci": "science",
+    "mgmt": "management",
+    "mgt": "management",
+    "univ": "university",
+    "dev": "development",
+    "res": "research",
+    "tech": "technology",
+    "intl": "international",
+}
+
+# Unit type keywords, checked in order (first match wins)
+UNIT_TYPE_KEYWORDS = [
+    ("faculty", "Faculty"),
+    ("institute", "Institute"),
+    ("centre", "Centre"),
+    ("division", "Administrative Division"),
+    ("department", "Administrative Department"),
+    ("office", "Administrative Office"),
+    ("library", "Library"),
+    ("chancellery", "Chancellery"),
+]
+DEFAULT_UNIT_TYPE = "Organisation Unit"
+
+
+# ============ NORMALISATION ============
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def normalise(text):
+    """Lowercase, '&' -> 'and', strip punctuation, expand abbreviations"""
+    text = _PUNCT_RE.sub(" ", str(text).lower().replace("&", " and "))
+    return " ".join(ABBREVIATIONS.get(w, w) for w in text.split())
+
+
+def classify_unit_type(text):
+    """Classify a unit name into a logical unit type"""
+    words = set(normalise(text).split())
+    for keyword, unit_type in UNIT_TYPE_KEYWORDS:
+        if keyword in words:
+            return unit_type
+    return DEFAULT_UNIT_TYPE
+
+
+def trigrams(key):
+    """Padded character trigrams of a normalised key"""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, max_dist):
+    """Banded Levenshtein distance, returning max_dist + 1 once the bound is exceeded"""
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    if len(a) < len(b):
+        a, b = b, a
+    over = max_dist + 1
+    previous = [j if j <= max_dist else over for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        # Only cells within max_dist of the diagonal can stay under the bound
+        lo = max(1, i - max_dist)
+        hi = min(len(b), i + max_dist)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= max_dist else over
+        row_min = current[0]
+        for j in range(lo, hi + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_dist:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+def _is_transposition(a, b):
+    """True if b is a with one pair of adjacent characters swapped"""
+    if len(a) != len(b) or a == b:
+        return False
+    diffs = [i for i in range(len(a)) if a[i] != b[i]]
+    return len(diffs) == 2 and diffs[1] == diffs[0] + 1 and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+
+
+def _word_matches(word, others):
+    """True if word equals, or is a small typo of, one of others or of two adjacent others joined"""
+    candidates = others + [a + b for a, b in zip(others, others[1:])]
+    tolerance = len(word) // 4
+    for other in candidates:
+        if word == other or _is_transposition(word, other):
+            return True
+        if tolerance and edit_distance(word, other, tolerance) <= tolerance:
+            return True
+    return False
+
+
+def tokens_compatible(key, candidate):
+    """True if the two keys differ only by typos within words.
+
+    Word-level edits are bounded by len(word) // 4 (plus adjacent swaps and
+    merged words), so "departmnt" matches "department" but "civil" never
+    matches "chemical" and "in" never matches "on". Candidate words shorter
+    than 4 characters need not appear in the key.
+    """
+    key_words = key.split()
+    candidate_words = candidate.split()
+    for words, others, min_len in ((key_words, candidate_words, 0), (candidate_words, key_words, 4)):
+        other_set = set(others)
+        for word in words:
+            if len(word) < min_len or word in other_set:
+                continue
+            # A candidate word may have been merged into a key word ("departmentof")
+            if min_len and any(word in other for other in others):
+                continue
+            if not _word_matches(word, others):
+                return False
+    return True
+
+
+# ============ UNIT INDEX ============
+class UnitIndex:
+    """Exact + trigram index over unit canonicals, acronyms and aliases"""
+
+    def __init__(self, units):
+        self.units = units
+        self.keys = []                    # normalised key per key id
+        self.key_units = []               # unit ids per key id
+        self.exact = {}                   # normalised key -> key id
+        self.postings = defaultdict(list) # trigram -> key ids (fuzzy-eligible keys only)
+        self._fuzzy_cache = OrderedDict() # LRU: (normalised key, threshold) -> (key id, score)
+        self._build()
+
+    def _build(self):
+        for unit_id, unit in enumerate(self.units):
+            names = [unit.get("canonical"), unit.get("acronym")] + list(unit.get("aliases") or [])
+            for name in names:
+                if not name or name == "NULL":
+                    continue
+                self.add_alias(normalise(name), unit_id)
+
+    def add_alias(self, key, unit_id):
+        """Register a normalised key for a unit, returning its key id"""
+        if not key:
+            return None
+        key_id = self.exact.get(key)
+        if key_id is None:
+            key_id = len(self.keys)
+            self.keys.append(key)
+            self.key_units.append([unit_id])
+            self.exact[key] = key_id
+            self._fuzzy_cache.clear()
+            if len(key) >= FUZZY_MIN_LENGTH:
+                for gram in trigrams(key):
+                    self.postings[gram].append(key_id)
+        elif unit_id not in self.key_units[key_id]:
+            self.key_units[key_id].append(unit_id)
+        return key_id
+
+    def add_unit(self, unit):
+        """Append a unit and index its names, returning its unit id"""
+        unit_id = len(self.units)
+        self.units.append(unit)
+        for name in [unit.get("canonical"), unit.get("acronym")] + list(unit.get("aliases") or []):
+            if name and name != "NULL":
+                self.add_alias(normalise(name), unit_id)
+        return unit_id
+
+    # ---------- lookup ----------
+    def _pick(self, unit_ids, parent_id):
+        """Prefer the unit under parent_id when a key is shared across units"""
+        if parent_id is not None and len(unit_ids) > 1:
+            parent_name = self.units[parent_id].get("canonical")
+            for unit_id in unit_ids:
+                if self.units[unit_id].get("parent") == parent_name:
+                    return unit_id
+        return unit_ids[0]
+
+    def _fuzzy(self, key, threshold):
+        grams = trigrams(key)
+        counts = Counter(chain.from_iterable(self.postings.get(gram, ()) for gram in grams))
+        if not counts:
+            return None, 0.0
+
+        # Rank candidates by Dice coefficient over trigrams (a padded key has
+        # len(key) + 1 trigrams), then verify only the best few
+        ranked = heapq.nlargest(
+            FUZZY_CANDIDATES,
+            counts.items(),
+            key=lambda kv: 2 * kv[1] / (len(grams) + len(self.keys[kv[0]]) + 1),
+        )
+
+        # Score candidates down to threshold - margin so near-misses from
+        # other units (e.g. "Civil" vs "Chemical" Engineering) are seen
+        floor = threshold - FUZZY_MARGIN
+        scored = []
+        best = 0.0
+        for key_id, _ in ranked:
+            candidate = self.keys[key_id]
+            length = max(len(key), len(candidate))
+            # Anything more than a margin below the best so far is irrelevant, so narrow the band
+            max_dist = int(length * (1 - max(floor, best - FUZZY_MARGIN)))
+            dist = edit_distance(key, candidate, max_dist)
+            if dist <= max_dist and tokens_compatible(key, candidate):
+                score = 1 - dist / length
+                scored.append((score, key_id))
+                best = max(best, score)
+        if not scored:
+            return None, 0.0
+
+        scored.sort(reverse=True)
+        best_score, best_id = scored[0]
+        if best_score < threshold:
+            return None, 0.0
+
+        # Reject ambiguous matches: another unit scores within the margin
+        best_units = set(self.key_units[best_id])
+        for score, key_id in scored[1:]:
+            if best_score - score >= FUZZY_MARGIN:
+                break
+            if set(self.key_units[key_id]) != best_units:
+                return None, 0.0
+        return best_id, best_score
+
+    def resolve(self, name, parent=None, threshold=FUZZY_THRESHOLD, fuzzy=True):
+        """Resolve a name to {unit, score, method} or None
+
+        With fuzzy=False only exact (normalised) matches are returned.
+        """
+        key = normalise(name)
+        if not key:
+            return None
+
+        parent_id = None
+        if parent:
+            parent_match = self.resolve(parent, threshold=threshold, fuzzy=fuzzy)
+            if parent_match:
+                parent_id = parent_match["unit_id"]
+
+        key_id = self.exact.get(key)
+        if key_id is not None:
+            unit_id = self._pick(self.key_units[key_id], parent_id)
+            return {"unit_id": unit_id, "unit": self.units[unit_id], "score": 1.0, "method": "exact"}
+
+        if not fuzzy or len(key) < FUZZY_MIN_LENGTH:
+            return None
+
+        cache_key = (key, threshold)
+        cache = self._fuzzy_cache
+        if cache_key in cache:
+            cache.move_to_end(cache_key)
+        else:
+            cache[cache_key] = self._fuzzy(key, threshold)
+            if len(cache) > FUZZY_CACHE_SIZE:
+                cache.popitem(last=False)
+        key_id, score = cache[cache_key]
+        if key_id is None:
+            return None
+        unit_id = self._pick(self.key_units[key_id], parent_id)
+        return {"unit_id": unit_id, "unit": self.units[unit_id], "score": round(score, 4), "method": "fuzzy"}
+
+    # ---------- persistence ----------
+    def to_dict(self, source_hash=None):
+        return {
+            "version": INDEX_VERSION,
+            "source_hash": source_hash,
+            "units": self.units,
+            "keys": self.keys,
+            "key_units": self.key_units,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls.__new__(cls)
+        index.units = data["units"]
+        index.keys = data["keys"]
+        index.key_units = data["key_units"]
+        index.exact = {key: key_id for key_id, key in enumerate(index.keys)}
+        index.postings = defaultdict(list, data["postings"])
+        index._fuzzy_cache = OrderedDict()
+        return index
+
+    def save(self, path, source_hash=None):
+        atomic_write_json(path, self.to_dict(source_hash), indent=None)
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_units(units_file=UNITS_JSON_FILE):
+    """Load the units list, or [] if the file does not exist"""
+    if not os.path.exists(units_file):
+        return []
+    with open(units_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_index(units_file=UNITS_JSON_FILE, index_file=INDEX_FILE, rebuild=False):
+    """Load the persisted index, rebuilding it if units.json has changed"""
+    source_hash = _file_hash(units_file)
+    if not rebuild and os.path.exists(index_file):
+        try:
+            with open(index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("source_hash") == source_hash:
+                return UnitIndex.from_dict(data)
+        except (OSError, ValueError, KeyError):
+            pass  # Corrupt or outdated index, rebuild below
+
+    index = UnitIndex(load_units(units_file))
+    index.save(index_file, source_hash)
+    return index
+
+
+# ============ BULK CSV NORMALISATION ============
+def _read_text(path):
+    """Read a text file as UTF-8, falling back to cp1252 (Excel exports)"""
+    raw = Path(path).read_bytes()
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return raw.decode(encoding), encoding
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("latin-1"), "latin-1"
+
+
+def normalise_csv(index, input_file, output_file=None, column="Department",
+                  parent=None, to="canonical", threshold=FUZZY_THRESHOLD):
+    """Rewrite one column of a CSV to canonical unit names/acronyms, atomically"""
+    text, encoding = _read_text(input_file)
+    reader = csv.DictReader(io.StringIO(text, newline=""))
+    if column not in (reader.fieldnames or []):
+        raise ValueError(f"Column not found: {column}")
+
+    # Each distinct value is resolved once, so throughput is bounded by CSV I/O
+    cache = {}
+    unresolved = defaultdict(int)
+    rows = []
+    changed = 0
+    for row in reader:
+        value = row[column]
+        if value not in cache:
+            match = index.resolve(value, parent=parent, threshold=threshold) if value.strip() else None
+            if match:
+                unit = match["unit"]
+                cache[value] = unit.get("acronym") if to == "acronym" and unit.get("acronym") else unit["canonical"]
+            else:
+                cache[value] = None
+        resolved = cache[value]
+        if resolved is None:
+            unresolved[value] += 1
+        elif resolved != value:
+            row[column] = resolved
+            changed += 1
+        rows.append(row)
+
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=reader.fieldnames, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    atomic_write_text(output_file or input_file, out.getvalue(), encoding=encoding, newline="")
+
+    return {
+        "rows": len(rows),
+        "changed": changed,
+        "distinct": len(cache),
+        "unresolved": dict(unresolved),
+    }
+
+
+# ============ SELF-CHECK ============
+def check_leave_one_out(units, threshold=FUZZY_THRESHOLD):
+    """Resolve each unit's canonical with that unit left out of the index.
+
+    A fuzzy hit means a new unit with that name would be folded into a
+    different (sibling) unit. Returns a list of (canonical, wrong match, score).
+    """
+    conflicts = []
+    for unit_id, unit in enumerate(units):
+        canonical = unit.get("canonical")
+        if not canonical:
+            continue
+        index = UnitIndex(units[:unit_id] + units[unit_id + 1:])
+        match = index.resolve(canonical, threshold=threshold)
+        # Exact hits are units sharing the same name (e.g. per-faculty duplicates)
+        if match and match["method"] == "fuzzy":
+            conflicts.append((canonical, match["unit"]["canonical"], match["score"]))
+    return conflicts
+
+
+# ============ BENCHMARK ============
+def _mutate(name, rng):
+    """Produce a realistic variant of a unit name"""
+    choice = rng.random()
+    if choice < 0.25:
+        name = name.replace("Department", "Dept.").replace("Centre", "Ctr.")
+    elif choice < 0.5:
+        name = name.upper() if rng.random() < 0.5 else name.lower()
+    elif choice < 0.75 and len(name) > 6:
+        i = rng.randrange(1, len(name) - 1)
+        name = name[:i] + name[i + 1:]  # Dropped character
+    elif len(name) > 6:
+        i = rng.randrange(1, len(name) - 2)
+        name = name[:i] + name[i + 1] + name[i] + name[i + 2:]  # Transposition
+    return name
+
+
+def benchmark(index, n=100000, seed=42):
+    """Resolve n synthetic name variants and report throughput and accuracy"""
+    rng = random.Random(seed)
+    pool = [(unit_id, unit["canonical"]) for unit_id, unit in enumerate(index.units) if unit.get("canonical")]
+    samples = []
+    for _ in range(n):
+        unit_id, name = rng.choice(pool)
+        samples.append((unit_id, _mutate(name, rng)))
+
+    start = time.perf_counter()
+    hits = correct = 0
+    for unit_id, name in samples:
+        match = index.resolve(name)
+        if match:
+            hits += 1
+            if match["unit"]["canonical"] == index.units[unit_id]["canonical"]:
+                correct += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "names": n,
+        "distinct": len({name for _, name in samples}),
+        "seconds": round(elapsed, 3),
+        "names_per_second": round(n / elapsed) if elapsed else None,
+        "resolved_pct": round(100 * hits / n, 2),
+        "correct_pct": round(100 * correct / n, 2),
+    }
+
+
+# ============ CLI ============
+def main():
+    parser = argparse.ArgumentParser(description="UTAR organisation unit resolver")
+    parser.add_argument("--units", default=str(UNITS_JSON_FILE), help="Path to units.json")
+    parser.add_argument("--index", default=str(INDEX_FILE), help="Path to the persisted index")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("build", help="Rebuild the persisted index")
+
+    p_resolve = sub.add_parser("resolve", help="Resolve a single unit name")
+    p_resolve.add_argument("name")
+    p_resolve.add_argument("--parent", help="Parent unit used to break ties between shared aliases")
+    p_resolve.add_argument("--threshold", type=float, default=FUZZY_THRESHOLD)
+    p_resolve.add_argument("--json", action="store_true", help="Output as JSON")
+
+    p_csv = sub.add_parser("normalise-csv", help="Normalise a unit column of a CSV file")
+    p_csv.add_argument("file")
+    p_csv.add_argument("--column", default="Department")
+    p_csv.add_argument("--parent", help="Parent unit, e.g. LKCFES")
+    p_csv.add_argument("--to", choices=["canonical", "acronym"], default="canonical")
+    p_csv.add_argument("--threshold", type=float, default=FUZZY_THRESHOLD)
+    p_csv.add_argument("--output", help="Output file (default: rewrite in place)")
+
+    p_check = sub.add_parser("check", help="Check no unit fuzzily resolves to a sibling when left out")
+    p_check.add_argument("--threshold", type=float, default=FUZZY_THRESHOLD)
+
+    p_bench = sub.add_parser("bench", help="Benchmark fuzzy resolution on synthetic names")
+    p_bench.add_argument("--n", type=int, default=100000)
+    p_bench.add_argument("--seed", type=int, default=42)
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.units):
+        print(f"Error: Units file not found: {args.units}")
+        sys.exit(1)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        index = load_index(args.units, args.index, rebuild=True)
+        print(f"Indexed {len(index.units)} units, {len(index.keys)} keys in {time.perf_counter() - start:.3f}s")
+        print(f"Saved to {args.index}")
+        return
+
+    index = load_index(args.units, args.index)
+
+    if args.command == "resolve":
+        match = index.resolve(args.name, parent=args.parent, threshold=args.threshold)
+        if args.json:
+            print(json.dumps(match, indent=2, ensure_ascii=False))
+        elif match:
+            unit = match["unit"]
+            print(f"{unit['canonical']} ({unit.get('acronym') or '-'}) [{match['method']}, {match['score']}]")
+        else:
+            print(f"No match for: {args.name}")
+            sys.exit(1)
+
+    elif args.command == "normalise-csv":
+        start = time.perf_counter()
+        stats = normalise_csv(index, args.file, args.output, args.column, args.parent, args.to, args.threshold)
+        elapsed = time.perf_counter() - start
+        print(f"Processed {stats['rows']} rows ({stats['distinct']} distinct values) in {elapsed:.3f}s")
+        print(f"Changed {stats['changed']} rows.")
+        for value, count in stats["unresolved"].items():
+            print(f"  Unresolved: {value!r} x{count}")
+
+    elif args.command == "check":
+        conflicts = check_leave_one_out(load_units(args.units), args.threshold)
+        for canonical, other, score in conflicts:
+            print(f"  ✗ {canonical!r} -> {other!r} ({score})")
+        print(f"{len(conflicts)} conflicts in {len(index.units)} units.")
+        if conflicts:
+            sys.exit(1)
+
+    elif args.command == "bench":
+        print(json.dumps(benchmark(index, args.n, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()